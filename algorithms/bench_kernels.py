@@ -0,0 +1,63 @@
+"""
+Author		: Muhammad Arifin
+Institution	: Department of Nuclear Engineering and Engineering Physics, Universitas Gadjah Mada
+License		: MIT License
+Description	: Benchmark of the trilateration paths on synthetic scans.
+
+		  - numpy   : rssi_to_distance + trilaterate over the whole batch,
+		  	      every pass streams the full arrays through memory
+		  - blocked : NumPy fallback of fused_trilateration, cache sized blocks
+		  - numba   : compiled fused kernel (only when Numba is installed)
+
+		  Usage: python bench_kernels.py [rows]   (default 10^7 rows)
+"""
+
+import sys
+import time
+import numpy as np
+
+from scanbatch import ScanBatch, rssi_to_distance
+from kernels import HAVE_NUMBA, trilaterate, fused_trilateration
+
+
+def bench(name, func, batch, repeat=3):
+	best = np.inf
+	for _ in range(repeat):
+		start = time.perf_counter()
+		func(batch)
+		best = min(best, time.perf_counter() - start)
+
+	rows = len(batch)
+	print("%-8s %8.3f s  %7.1f Mrows/s  %6.2f ns/row" %(name, best, rows / best / 1e6, best / rows * 1e9))
+	return batch.result.copy()
+
+
+def main():
+	rows = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**7
+
+	# Synthetic scans of case 3D2
+	rng = np.random.default_rng(0)
+	batch = ScanBatch(rng.integers(-80, -40, size=(rows, 3)), "3D2")
+
+	gamma = 2.255
+	K = -49
+
+	def numpy_path(batch):
+		rssi_to_distance(batch, gamma, K)
+		trilaterate(batch.dist, batch.ap_coords, batch.target, batch.result)
+
+	print("%d rows, %.1f MB per batch" %(rows, batch.nbytes / 1e6))
+	ref = bench("numpy", numpy_path, batch)
+	res = bench("blocked", lambda b: fused_trilateration(b, gamma, K, use_numba=False), batch)
+	assert np.allclose(res["err"], ref["err"], rtol=1e-4, atol=1e-4)
+
+	if HAVE_NUMBA:
+		# compile before timing
+		fused_trilateration(ScanBatch(batch.rssi[:10], "3D2"), gamma, K, use_numba=True)
+		res = bench("numba", lambda b: fused_trilateration(b, gamma, K, use_numba=True), batch)
+		assert np.allclose(res["err"], ref["err"], rtol=1e-4, atol=1e-4)
+	else:
+		print("numba    not installed")
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,202 @@
+"""
+Author		: Muhammad Arifin
+Institution	: Department of Nuclear Engineering and Engineering Physics, Universitas Gadjah Mada
+License		: MIT License
+Description	: Accuracy evaluation of indoor positioning results. All error metrics
+		  of every method x case are computed in one pass and written to a single
+		  comparison table, so results don't have to be copied by hand from the
+		  printed output anymore.
+
+		  Metrics (Euclidean error e = sqrt((x - xreal)^2 + (y - yreal)^2)):
+		  rmse		: sqrt(mean(e^2))
+		  mean		: mean(e), this is what the scripts print as "MSE"
+		  median, p90, p95 : percentiles of e
+		  cep		: circular error probable, median distance of the
+			  	  estimates from their own mean position (precision)
+		  bias_x, bias_y : mean(x - xreal), mean(y - yreal)
+
+		  Bootstrap confidence intervals are computed for rmse, mean, median,
+		  p90 and p95. Resamples are drawn as one index matrix and reduced along
+		  its rows, so there is no Python loop over resamples.
+"""
+
+import os
+import csv
+import numpy as np
+
+
+# Metrics with bootstrap confidence intervals
+BOOTSTRAP_METRICS = ["rmse", "mean", "median", "p90", "p95"]
+
+# Columns of the comparison table
+TABLE_COLUMNS = (["method", "case", "n", "rmse", "mean", "median", "p90", "p95",
+				  "cep", "bias_x", "bias_y"] +
+				 ["%s_%s" %(m, b) for m in BOOTSTRAP_METRICS for b in ("lo", "hi")])
+
+# Max number of elements of one block of resampled errors
+BOOTSTRAP_BLOCK = 2**22
+
+
+def error_metrics(x_pred, y_pred, xreal, yreal):
+	"""
+	Calculate error metrics of predicted coordinates.
+	xreal and yreal can be scalars or arrays matching x_pred and y_pred.
+
+	Returns (metrics, err) where err is the array of Euclidean errors.
+	Metrics of an empty case are NaN.
+	"""
+	x_pred = np.asarray(x_pred, dtype=float)
+	y_pred = np.asarray(y_pred, dtype=float)
+
+	dx = x_pred - xreal
+	dy = y_pred - yreal
+	err = np.sqrt(dx**2 + dy**2)
+
+	if len(err) == 0:
+		metrics = {m: np.nan for m in BOOTSTRAP_METRICS + ["cep", "bias_x", "bias_y"]}
+		metrics["n"] = 0
+		return metrics, err
+
+	median, p90, p95 = np.percentile(err, [50, 90, 95])
+
+	# CEP around the mean estimated position
+	spread = np.sqrt((x_pred - np.mean(x_pred))**2 + (y_pred - np.mean(y_pred))**2)
+
+	metrics = {
+		"n"		: len(err),
+		"rmse"	: np.sqrt(np.mean(err**2)),
+		"mean"	: np.mean(err),
+		"median": median,
+		"p90"	: p90,
+		"p95"	: p95,
+		"cep"	: np.median(spread),
+		"bias_x": np.mean(dx),
+		"bias_y": np.mean(dy),
+	}
+
+	return metrics, err
+
+
+def bootstrap_ci(err, n_resamples=1000, level=0.95, rng=None):
+	"""
+	Calculate percentile bootstrap confidence intervals of the
+	metrics in BOOTSTRAP_METRICS from an array of Euclidean errors.
+
+	Returns {metric: (lower, upper)}, NaN for an empty array.
+	"""
+	err = np.asarray(err, dtype=float)
+	rng = np.random.default_rng(rng)
+	num = len(err)
+
+	if num == 0:
+		return {m: (np.nan, np.nan) for m in BOOTSTRAP_METRICS}
+
+	stats = np.empty((len(BOOTSTRAP_METRICS), n_resamples))
+
+	# Resample in blocks of rows to bound the memory of the index matrix
+	rows = max(1, BOOTSTRAP_BLOCK // max(num, 1))
+	for start in range(0, n_resamples, rows):
+		stop = min(start + rows, n_resamples)
+		sample = err[rng.integers(0, num, size=(stop - start, num))]
+
+		stats[0, start:stop] = np.sqrt(np.mean(sample**2, axis=1))
+		stats[1, start:stop] = np.mean(sample, axis=1)
+		stats[2:, start:stop] = np.percentile(sample, [50, 90, 95], axis=1)
+
+	alpha = (1 - level) / 2
+	lower, upper = np.quantile(stats, [alpha, 1 - alpha], axis=1)
+
+	return {m: (lower[i], upper[i]) for i, m in enumerate(BOOTSTRAP_METRICS)}
+
+
+def evaluate(results, n_resamples=1000, level=0.95, seed=0):
+	"""
+	Evaluate every method x case in one pass.
+
+	results is a dict {(method, case): (x_pred, y_pred, xreal, yreal)}.
+	Returns a list of table rows (dicts with TABLE_COLUMNS keys).
+	"""
+	rng = np.random.default_rng(seed)
+	table = []
+
+	for (method, case), (x_pred, y_pred, xreal, yreal) in sorted(results.items()):
+		row = {"method": method, "case": case}
+		metrics, err = error_metrics(x_pred, y_pred, xreal, yreal)
+		row.update(metrics)
+
+		for m, (lo, hi) in bootstrap_ci(err, n_resamples, level, rng).items():
+			row["%s_lo" %m] = lo
+			row["%s_hi" %m] = hi
+
+		table.append(row)
+
+	return table
+
+
+def write_table(table, fname):
+	"""
+	Write the comparison table as csv file.
+	"""
+	with open(fname, "w", newline="") as f:
+		writer = csv.DictWriter(f, fieldnames=TABLE_COLUMNS)
+		writer.writeheader()
+		for row in table:
+			writer.writerow({k: (round(v, 4) if isinstance(v, float) else v) for k, v in row.items()})
+
+
+def print_table(table):
+	"""
+	Print a short version of the comparison table.
+	"""
+	header = "%-14s %-5s %6s %6s %6s %6s %6s %6s %7s %7s" %(
+		"method", "case", "rmse", "mean", "median", "p90", "p95", "cep", "bias_x", "bias_y")
+	print(header)
+	print("-" * len(header))
+	for row in table:
+		print("%-14s %-5s %6.2f %6.2f %6.2f %6.2f %6.2f %6.2f %7.2f %7.2f" %(
+			row["method"], row["case"], row["rmse"], row["mean"], row["median"],
+			row["p90"], row["p95"], row["cep"], row["bias_x"], row["bias_y"]))
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~#
+#~~~~~~~~~~~~~~~~~~~~~~~~ Main Program ~~~~~~~~~~~~~~~~~~~~~~~~#
+#~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~#
+def main():
+	from trilateration import cached_trilateration
+	from minmax import cached_minmax
+	from results_cache import ResultsCache
+
+	# Data Paths
+	# path = 'D:/Skripsweetku/Raw Data/Pengukuran Variasi Jarak Ulangan/'
+	path = 'D:/Skripsweetku/Raw Data/Pengukuran Variasi Jarak dan Manusia/'
+	cases = os.listdir(path)
+
+	# RSSI @d0 and path loss exponent (gamma)
+	gamma = 2.255
+	K = -49
+
+	# Results of unchanged cases are taken from the cache
+	cache = ResultsCache()
+
+	results = {}
+	files = {}
+	for x in cases:
+		case = x[0:3].upper()
+
+		# 2d2.csv and 2D2.csv would overwrite each other in the table
+		if case in files:
+			raise ValueError("Files %s and %s are both case %s!" %(files[case], x, case))
+		files[case] = x
+
+		res = cached_trilateration(cache, path, x, gamma, K)
+		results[("trilateration", case)] = (res["x"], res["y"], res["target"][0], res["target"][1])
+
+		res = cached_minmax(cache, path, x, gamma, K)
+		results[("minmax", case)] = (res["x"], res["y"], res["target"][0], res["target"][1])
+
+	table = evaluate(results)
+	write_table(table, "evaluation_results.csv")
+	print_table(table)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,155 @@
+"""
+Author		: Muhammad Arifin
+Institution	: Department of Nuclear Engineering and Engineering Physics, Universitas Gadjah Mada
+License		: MIT License
+Description	: Trilateration kernels working on ScanBatch buffers.
+
+		  fused_trilateration turns the RSSI of every scan into distances,
+		  solves the position and computes the error in one pass:
+		  - with Numba installed, a compiled loop parallelized over rows
+		    with prange, keeping everything of a row in registers
+		  - without Numba, the NumPy path is run block by block so all
+		    intermediate buffers of a block stay in cache
+
+		  A, B, D, E and the determinant only depend on the APs coordinates,
+		  per scan only C = C0 + r1^2 - r2^2 and F = F0 + r2^2 - r3^2 change.
+"""
+
+import numpy as np
+
+from scanbatch import distance, distance_params
+
+try:
+	from numba import njit, prange
+	HAVE_NUMBA = True
+except ImportError:
+	prange = range
+	HAVE_NUMBA = False
+
+
+# Rows per block of the NumPy fallback. With (n x 3) float32 distances
+# and three float32 result columns a block is ~0.5 MB, small enough to
+# stay in L2 cache between the passes over it.
+BLOCK_ROWS = 2**14
+
+
+######## Function to calculate trilateration parameters ########
+
+def trilat_params(xi,yi,xj,yj,ri,rj):
+	a = -2*xi + 2*xj
+	b = -2*yi + 2*yj
+	c = ri**2 - rj**2 - xi**2 + xj**2 - yi**2 + yj**2
+
+	return a,b,c
+
+
+def trilat_constants(ap_coords):
+	"""
+	Scan independent trilateration constants (A, B, C0, D, E, F0, det).
+	"""
+	(x1, y1), (x2, y2), (x3, y3) = np.asarray(ap_coords, dtype=float)
+
+	A, B, C0 = trilat_params(x1, y1, x2, y2, 0, 0)
+	D, E, F0 = trilat_params(x2, y2, x3, y3, 0, 0)
+
+	# x = CE - BF / AE - BD; y = CD - AF / BD - AE
+	det = A*E - B*D
+
+	return A, B, C0, D, E, F0, det
+
+
+######## NumPy trilateration ########
+
+def trilaterate(dist, ap_coords, target, out):
+	"""
+	Trilateration of an (n x 3) distance matrix. Estimated coordinates
+	and errors are written in place into the result array out.
+	"""
+	A, B, C0, D, E, F0, det = trilat_constants(ap_coords)
+	xreal, yreal = target
+
+	# Squared distances, reusing the error column as scratch buffer
+	r1_sq = out["err"]
+	r2_sq = np.square(dist[:, 1])
+
+	# C is stored in x and F in y
+	np.square(dist[:, 0], out=r1_sq)
+	np.subtract(r1_sq, r2_sq, out=out["x"])
+	out["x"] += C0
+	np.square(dist[:, 2], out=r1_sq)
+	np.subtract(r2_sq, r1_sq, out=out["y"])
+	out["y"] += F0
+
+	C = out["x"]
+	F = out["y"]
+	np.multiply(C, D / det, out=r2_sq)		# CD / det
+	np.multiply(C, E / det, out=C)			# CE / det
+	np.multiply(F, B / det, out=r1_sq)		# BF / det
+	C -= r1_sq								# x = (CE - BF) / (AE - BD)
+	np.multiply(F, A / det, out=F)			# AF / det
+	F -= r2_sq								# y = (CD - AF) / (BD - AE)
+
+	# Euclidean error
+	np.subtract(out["x"], xreal, out=r1_sq)
+	np.subtract(out["y"], yreal, out=r2_sq)
+	np.hypot(r1_sq, r2_sq, out=out["err"])
+
+	return out
+
+
+######## Fused RSSI -> distance -> position -> error ########
+
+def _fused_rows(rssi, rssi_d0, scale, consts, xreal, yreal, dist, x, y, err):
+	A, B, C0, D, E, F0, det = consts
+
+	for i in prange(rssi.shape[0]):
+		r1 = np.exp(scale[0] * (rssi_d0[0] - rssi[i, 0]))
+		r2 = np.exp(scale[1] * (rssi_d0[1] - rssi[i, 1]))
+		r3 = np.exp(scale[2] * (rssi_d0[2] - rssi[i, 2]))
+		dist[i, 0] = r1
+		dist[i, 1] = r2
+		dist[i, 2] = r3
+
+		C = C0 + r1*r1 - r2*r2
+		F = F0 + r2*r2 - r3*r3
+		xi = (C*E - B*F) / det
+		yi = (A*F - C*D) / det
+
+		x[i] = xi
+		y[i] = yi
+		err[i] = np.sqrt((xi - xreal)**2 + (yi - yreal)**2)
+
+
+if HAVE_NUMBA:
+	_fused_kernel = njit(parallel=True, cache=True)(_fused_rows)
+
+
+def fused_trilateration(batch, ple, rssi_d0, use_numba=None, block=BLOCK_ROWS):
+	"""
+	Distances, trilateration and errors of a ScanBatch in one pass,
+	written in place into batch.dist and batch.result.
+
+	use_numba selects the compiled kernel, by default it is used
+	whenever Numba is installed.
+	"""
+	if use_numba is None:
+		use_numba = HAVE_NUMBA
+	elif use_numba and not HAVE_NUMBA:
+		raise ImportError("Numba is required for the compiled trilateration kernel!")
+
+	k, scale = distance_params(ple, rssi_d0)
+
+	if use_numba:
+		consts = np.array(trilat_constants(batch.ap_coords))
+		xreal, yreal = batch.target.astype(float)
+		res = batch.result
+		_fused_kernel(batch.rssi, k, scale, consts, xreal, yreal, batch.dist,
+					  res["x"], res["y"], res["err"])
+		return res
+
+	for start in range(0, len(batch), block):
+		stop = start + block
+		dist = distance(batch.rssi[start:stop], k, scale, batch.dist[start:stop])
+		trilaterate(dist, batch.ap_coords, batch.target, batch.result[start:stop])
+
+	return batch.result
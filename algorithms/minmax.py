@@ -36,124 +36,130 @@ SOFTWARE.
 
 import numpy as np
 import matplotlib.pyplot as plt
-import pandas as pd 
 import os
 
+from scanbatch import RESULT_DTYPE, read_scans, rssi_to_distance
+from results_cache import ResultsCache
 
 
-def main():
-	# path = 'D:/Skripsweetku/Raw Data/Pengukuran Variasi Jarak Ulangan/'
-	path = 'D:/Skripsweetku/Raw Data/Pengukuran Variasi Jarak dan Manusia/'
-	cases = os.listdir(path)
-	# case = '4D4.csv' # for testing purpose
-	for case in cases:
-		# read data
-		df = pd.read_csv(path+case)
 
-		# drop time column
-		df = df.drop(columns=["Time"])
+######## Min-Max engine ########
+# The minmax values are the smallest values from the set of maximum
+# coordinates (coordinate + dist) of all APs and all scans, the maxmin
+# values are the largest values from the set of minimum coordinates
+# (coordinate - dist). The i-th smallest minmax is paired with the
+# i-th largest maxmin. Distances must already be in batch.dist.
 
-		# drop NaN values
-		df = df.dropna()
+def smallest_sorted(values, num, out):
+	"""
+	Write the num smallest values (ascending) into out.
+	values is used as scratch buffer and is overwritten.
+	"""
+	flat = values.reshape(-1)
+	if num < len(flat):
+		flat.partition(num - 1)
+	out[:] = np.sort(flat[:num])
+	return out
 
-		# take only data from column 1-2
-		df = df.iloc[:,0:3]
 
-		# Rename columns to AP1, AP2, and AP3
-		df.columns = ["AP1", "AP2", "AP3"]
+def minmax_batch(batch, num=100, out=None, scratch=None):
+	"""
+	Calculate min-max target coordinates of a ScanBatch.
 
-		#~~~~~~~~~~~~~~~~ Distance calculation from rssi using ple data ~~~~~~~~~~~~~~~#
+	Returns a result array (x, y, err) of min(num, 3n) values. out and
+	scratch are optional preallocated result and (n x 3) float32 buffers.
+	"""
+	num = min(num, batch.dist.size)
+	if out is None:
+		out = np.empty(num, dtype=RESULT_DTYPE)
+	if scratch is None:
+		scratch = np.empty_like(batch.dist)
+	maxmin = np.empty(num, dtype=np.float32)
 
-		# Add path loss exponent and rssi at d0 parameters
-		# Create a lambda function to convert RSSI data into distance
-		dist = lambda k, n, rssi: 10**((k - rssi) / (10*n))
+	for axis, name in enumerate(["x", "y"]):
+		coords = batch.ap_coords[:, axis]
 
-		# path loss parameters
-		rssi_d0 = -49
-		ple = 2.255
+		# minmax = minimum value from a set of maximum values
+		np.add(batch.dist, coords, out=scratch)
+		smallest_sorted(scratch, num, out[name])
 
-		# Add distance columns in df 
-		for i in range(1,4):
-			df["dist%d"%i] = dist(rssi_d0, ple, df["AP%d"%i])
+		# maxmin = maximum value from a set of minimum values,
+		# the largest (coord - dist) are the smallest (dist - coord)
+		np.subtract(batch.dist, coords, out=scratch)
+		smallest_sorted(scratch, num, maxmin)
 
+		# Target = (minmax + maxmin) / 2
+		out[name] -= maxmin
+		out[name] /= 2
 
-		# Determining AP coordinate from case 
-		# 1Dx means d = 1, 2Dx means d = 2, cont..
+	#~~~~~~~~~~~~~~~~~~~~~~~~~  Sqrt Error ~~~~~~~~~~~~~~~~~~~~#
+	np.hypot(out["x"] - batch.target[0], out["y"] - batch.target[1], out=out["err"])
 
-		if case[0] == "1":
-			d = 1
-		elif case[0] == "2":
-			d = 2
-		elif case[0] == "3":
-			d = 3
-		else:
-			d = 4
+	return out
 
-		# Setting APs coordinates
-		# AP1
-		x1 = 0
-		y1 = 0
 
-		# AP2
-		x2 = 0
-		y2 = 1 * d
+######## Implementation of min-max calculation process ########
+# Function of Min-Max Calculation Process
+# Data to be processed is stored as csv file. 
 
-		# AP3
-		x3 = 1 * d
-		y3 = 1 * d
+def minmax_process(path, case, ple, rssi_d0):
+	# read data as scan batch, AP1, AP2, and AP3 coordinates
+	# and the target coordinates are determined from the case name
+	batch = read_scans(path, case)
 
-		xcoords = [x1, x2, x3]
-		ycoords = [y1, y2, y3]
+	#~~~~~~~~~~~~~~~~ Distance calculation from rssi using ple data ~~~~~~~~~~~~~~~#
+	rssi_to_distance(batch, ple, rssi_d0)
 
-		# Target coordinates
-		case = case.upper()
-		if case[1:3] == "D1":
-			xreal = (1/2) * d
-			yreal = 1*d
-		elif case[1:3] == "D2":
-			xreal = (1/4) * d
-			yreal = (3/4) * d
-		elif case[1:3] == "D3":
-			xreal = (1/2) * d
-			yreal = (1/2) * d
-		elif case[1:3] == "D4":
-			xreal = (1/2) * d
-			yreal = 0 * d
-
-		#~~~~~~~~~~~~~~~~~~~~~ Min and Max coordinates calculations ~~~~~~~~~~~~~~~~~~~~#
-		# Add xmax, xmin, ymin, and ymax of all APs into df
-		for i in range(1,4):
-			df["x%d_max"%i] = xcoords[i-1] + df["dist%d"%i]
-			df["x%d_min"%i] = xcoords[i-1] - df["dist%d"%i]
-			df["y%d_max"%i] = ycoords[i-1] + df["dist%d"%i]
-			df["y%d_min"%i] = ycoords[i-1] - df["dist%d"%i]
-
-		#print(df.head())
-
-		#~~~~~~~~~~~~~~~~~~~~~ Min and Max coordinates calculations ~~~~~~~~~~~~~~~~~~~~#
-
-		# Concantenate all the max and min coordinates
-		xmax = np.array(pd.concat([df["x1_max"], df["x2_max"], df["x3_max"]]).sort_values(ascending=True))
-		xmin = np.array(pd.concat([df["x1_min"], df["x2_min"], df["x3_min"]]).sort_values(ascending=False))
-		ymax = np.array(pd.concat([df["y1_max"], df["y2_max"], df["y3_max"]]).sort_values(ascending=True))
-		ymin = np.array(pd.concat([df["y1_min"], df["y2_min"], df["y3_min"]]).sort_values(ascending=False))
-
-		# assign 100 values for each minmax and maxmin values
-		# minmax = minimum value from a set of maximum values
-		# maxmin = maximum value from a set of minimum values 
+	#~~~~~~~~~~~~~~~~~~~~~~~~~  Min-Max Target calculations ~~~~~~~~~~~~~~~~~~~~~~~#
+	res = minmax_batch(batch)
+
+	#~~~~~~~~~~~~~~~~~~~~~~~~~  Mean Sqrt Error ~~~~~~~~~~~~~~~~~~~~#
+	MSEmm = np.mean(res["err"], dtype=np.float64)
+
+	ap_coordinates = batch.ap_coords.tolist()
+
+	# Return the predicted and real coordinates, MSE, and APs coordinates
+	return (res["x"], res["y"], batch.target.tolist(), MSEmm, ap_coordinates)
 
-		xminmax = xmax[:100]
-		xmaxmin = xmin[:100]
-		yminmax = ymax[:100]
-		ymaxmin = ymin[:100]
 
-		#~~~~~~~~~~~~~~~~~~~~~~~~~  Min-Max Target calculations ~~~~~~~~~~~~~~~~~~~~~~~#
-		x_pred = (xminmax + xmaxmin)/2
-		y_pred = (yminmax + ymaxmin)/2
+######## Cached min-max ########
+# Results of unchanged cases are taken from the cache.
+# Returns the cached columns x, y, err, target, and ap_coords.
 
-		#~~~~~~~~~~~~~~~~~~~~~~~~~  Sqrt Error and Mean Sqrt Error ~~~~~~~~~~~~~~~~~~~~#
-		SQEmm = np.sqrt((x_pred - xreal)**2 + (y_pred - yreal)**2)
-		MSEmm = np.mean(SQEmm)
+def cached_minmax(cache, path, case, ple, rssi_d0):
+	def compute():
+		x_pred, y_pred, real, MSEmm, ap_coordinates = minmax_process(path, case, ple, rssi_d0)
+		return x_pred, y_pred, real, ap_coordinates
+
+	key = cache.key(path, case, "minmax", ple=ple, rssi_d0=rssi_d0)
+	return cache.get_or_compute(key, compute)
+
+
+def main():
+	# path = 'D:/Skripsweetku/Raw Data/Pengukuran Variasi Jarak Ulangan/'
+	path = 'D:/Skripsweetku/Raw Data/Pengukuran Variasi Jarak dan Manusia/'
+	cases = os.listdir(path)
+	# case = '4D4.csv' # for testing purpose
+
+	# path loss parameters
+	rssi_d0 = -49
+	ple = 2.255
+
+	# Results of unchanged cases are taken from the cache
+	cache = ResultsCache()
+
+	for case in cases:
+		res = cached_minmax(cache, path, case, ple, rssi_d0)
+		x_pred, y_pred = res["x"], res["y"]
+		real, ap_coords = res["target"], res["ap_coords"]
+		MSEmm = np.mean(res["err"], dtype=np.float64)
+
+		x1, y1 = ap_coords[0]
+		x2, y2 = ap_coords[1]
+		x3, y3 = ap_coords[2]
+		xreal, yreal = real
+
+		case = case.upper()
 
 		print("Localization using ESP32 %s" %case[0:3])
 		print("MSE Min-Max %s:" %case[0:3],round(MSEmm,2),"\n")
@@ -0,0 +1,208 @@
+"""
+Author		: Muhammad Arifin
+Institution	: Department of Nuclear Engineering and Engineering Physics, Universitas Gadjah Mada
+License		: MIT License
+Description	: On-disk cache of per-case positioning results.
+
+		  Results are keyed by a hash of the csv file content, the case name
+		  (the APs and target coordinates are derived from it), the algorithm
+		  name and the calibration parameters (ple, rssi_d0, ...), so rerunning
+		  a campaign only recomputes cases whose data or parameters changed.
+		  Every entry is one .npz file with the columns x, y, err, target and
+		  ap_coords. When the cache grows over max_bytes the least recently
+		  used entries are removed.
+"""
+
+import os
+import time
+import hashlib
+import zipfile
+import tempfile
+import numpy as np
+
+from scanbatch import NUM_AP
+
+
+# Change when the stored results of an algorithm change meaning
+CACHE_VERSION = 2
+
+# Default size limit of the cache directory
+MAX_BYTES = 512 * 2**20
+
+# Parameters with one value per AP, a single value means the same for all APs
+PER_AP_PARAMS = ("ple", "rssi_d0")
+
+# Temporary files older than this (seconds) are left over from a crashed writer
+STALE_TMP_AGE = 3600
+
+# Errors of np.load on a damaged entry
+CORRUPTION_ERRORS = (ValueError, EOFError, KeyError, zipfile.BadZipFile)
+
+
+def file_hash(fname, chunk=2**20):
+	"""
+	sha256 of the content of a file.
+	"""
+	h = hashlib.sha256()
+	with open(fname, "rb") as f:
+		for block in iter(lambda: f.read(chunk), b""):
+			h.update(block)
+	return h.hexdigest()
+
+
+class ResultsCache:
+	def __init__(self, directory="results_cache", max_bytes=MAX_BYTES):
+		"""
+		Class for creating a results cache in the given directory.
+		max_bytes is the size limit of all entries together.
+		"""
+		self.directory = directory
+		self.max_bytes = max_bytes
+		os.makedirs(self.directory, exist_ok=True)
+
+		# Running size of the cache directory, updated on put so the
+		# directory is only scanned again when it grows over max_bytes
+		self.total_bytes = sum(size for _, size, _ in self._entries())
+
+	def key(self, path, case, algorithm, **params):
+		"""
+		ResultsCache method to build the key of a case from the csv file
+		content, the case name, the algorithm name, and its parameters.
+		Parameters are compared as floats, so -49 and -49.0 are the same,
+		and per AP parameters are broadcast to one value per AP, so
+		ple=2.255 and ple=[2.255, 2.255, 2.255] are the same too.
+		"""
+		h = hashlib.sha256()
+		h.update(("v%d;%s;%s;" %(CACHE_VERSION, algorithm, case.upper())).encode())
+		for name in sorted(params):
+			value = np.asarray(params[name], dtype=float)
+			if name in PER_AP_PARAMS:
+				value = np.broadcast_to(value, (NUM_AP,))
+			h.update(("%s=%r;" %(name, value.tolist())).encode())
+		h.update(file_hash(path + case).encode())
+		return h.hexdigest()
+
+	def _path(self, key):
+		return os.path.join(self.directory, key + ".npz")
+
+	def get(self, key):
+		"""
+		ResultsCache method to get the stored columns {name: array}
+		of a key, or None if the key is not in the cache.
+		"""
+		fname = self._path(key)
+		try:
+			with np.load(fname) as data:
+				columns = {name: data[name] for name in data.files}
+		except FileNotFoundError:
+			return None
+		except CORRUPTION_ERRORS:
+			# Broken entry, recompute it
+			self._remove(fname)
+			return None
+
+		# Mark as recently used, unless another process evicted it meanwhile
+		try:
+			os.utime(fname)
+		except FileNotFoundError:
+			pass
+		return columns
+
+	def put(self, key, **columns):
+		"""
+		ResultsCache method to store columns of a key. The entry is
+		written to a temporary file with a unique name first, so readers
+		never see a partially written entry, even when several processes
+		write the same key. Returns the stored columns.
+		"""
+		columns = {name: np.asarray(value) for name, value in columns.items()}
+
+		fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+		try:
+			with os.fdopen(fd, "wb") as f:
+				np.savez(f, **columns)
+			size = os.path.getsize(tmp)
+			os.replace(tmp, self._path(key))
+		except BaseException:
+			self._remove(tmp)
+			raise
+
+		self.total_bytes += size
+		if self.total_bytes > self.max_bytes:
+			self.evict()
+		return columns
+
+	def get_or_compute(self, key, compute):
+		"""
+		ResultsCache method to get the columns of a key, running compute
+		and storing its results when the key is not in the cache.
+
+		compute returns (x_pred, y_pred, target, ap_coords). Every
+		algorithm is stored with the same columns x, y, err, target,
+		and ap_coords, err being the Euclidean error of each estimate.
+		"""
+		columns = self.get(key)
+		if columns is None:
+			x_pred, y_pred, target, ap_coords = compute()
+			x_pred = np.asarray(x_pred)
+			y_pred = np.asarray(y_pred)
+			target = np.asarray(target)
+			err = np.hypot(x_pred - target[0], y_pred - target[1])
+			columns = self.put(key, x=x_pred, y=y_pred, err=err, target=target, ap_coords=ap_coords)
+		return columns
+
+	def _remove(self, fname):
+		try:
+			os.remove(fname)
+		except FileNotFoundError:
+			pass
+
+	def _entries(self, remove_stale=False):
+		"""
+		List (mtime, size, path) of all entries and temporary files.
+		Stale temporary files are removed instead when remove_stale is True.
+		"""
+		stale = time.time() - STALE_TMP_AGE
+		entries = []
+		for name in os.listdir(self.directory):
+			if not name.endswith((".npz", ".tmp")):
+				continue
+			fname = os.path.join(self.directory, name)
+			try:
+				stat = os.stat(fname)
+			except FileNotFoundError:
+				continue
+			if remove_stale and name.endswith(".tmp") and stat.st_mtime < stale:
+				self._remove(fname)
+				continue
+			entries.append((stat.st_mtime, stat.st_size, fname))
+		return entries
+
+	def evict(self):
+		"""
+		ResultsCache method to remove stale temporary files and the
+		least recently used entries until the cache is not larger
+		than max_bytes. Temporary files of running writers count
+		towards the size but are not removed.
+		"""
+		entries = self._entries(remove_stale=True)
+
+		total = sum(size for _, size, _ in entries)
+		for mtime, size, fname in sorted(entries):
+			if total <= self.max_bytes:
+				break
+			if fname.endswith(".npz"):
+				self._remove(fname)
+				total -= size
+
+		self.total_bytes = total
+
+	def clear(self):
+		"""
+		ResultsCache method to remove all entries and stale temporary files.
+		"""
+		for mtime, size, fname in self._entries(remove_stale=True):
+			if fname.endswith(".npz"):
+				self._remove(fname)
+
+		self.total_bytes = sum(size for _, size, _ in self._entries())
@@ -0,0 +1,216 @@
+"""
+Author		: Muhammad Arifin
+Institution	: Department of Nuclear Engineering and Engineering Physics, Universitas Gadjah Mada
+License		: MIT License
+Description	: Compact in-memory representation of a batch of RSSI scans.
+
+		  A scan is three RSSI bytes, so instead of a wide pandas data frame
+		  with float64 columns added one by one, a ScanBatch holds
+		  - rssi	: contiguous int8 matrix (n x 3)
+		  - dist	: float32 distance matrix (n x 3)
+		  - result	: structured array with x, y and err (float32) per scan
+		  All buffers are allocated once, the positioning engines write into
+		  them in place. That is 27 bytes per scan instead of ~160 bytes.
+
+		  pandas is only needed for the from_dataframe / to_dataframe adapters
+		  and is used by read_scans to parse csv files when it is installed.
+"""
+
+import csv
+import numpy as np
+
+try:
+	import pandas as pd
+except ImportError:
+	pd = None
+
+
+# Result of one scan: estimated coordinates and Euclidean error
+RESULT_DTYPE = np.dtype([("x", np.float32), ("y", np.float32), ("err", np.float32)])
+
+NUM_AP = 3
+
+
+class ScanBatch:
+	__slots__ = ("case", "rssi", "dist", "result", "ap_coords", "target")
+
+	def __init__(self, rssi, case="", ap_coords=None, target=None):
+		"""
+		Class for creating a batch of scans.
+
+		rssi is an (n x 3) array of RSSI values of AP1, AP2, and AP3.
+		ap_coords is a (3 x 2) array of APs coordinates and target is
+		the real (x, y) coordinate. If they are not given, they are
+		determined from the case name (see case_geometry).
+		"""
+		self.case = case
+		self.rssi = to_int8_rssi(rssi).reshape(-1, NUM_AP)
+
+		if ap_coords is None or target is None:
+			ap_coords, target = case_geometry(case)
+		self.ap_coords = np.asarray(ap_coords, dtype=np.float32).reshape(NUM_AP, 2)
+		self.target = np.asarray(target, dtype=np.float32).reshape(2)
+
+		# Output buffers, filled in place by the engines
+		self.dist = np.empty(self.rssi.shape, dtype=np.float32)
+		self.result = np.empty(len(self.rssi), dtype=RESULT_DTYPE)
+
+	def __len__(self):
+		return len(self.rssi)
+
+	@property
+	def nbytes(self):
+		return self.rssi.nbytes + self.dist.nbytes + self.result.nbytes
+
+
+def to_int8_rssi(rssi):
+	"""
+	Convert RSSI values into a contiguous int8 array. Values are rounded,
+	values that are not finite or do not fit in [-128, 127] raise a ValueError.
+	"""
+	rssi = np.asarray(rssi)
+	if rssi.dtype == np.int8:
+		return np.ascontiguousarray(rssi)
+
+	rounded = np.rint(rssi.astype(np.float64))
+	if not np.isfinite(rounded).all():
+		raise ValueError("RSSI values must be finite!")
+	if rounded.size and (rounded.min() < -128 or rounded.max() > 127):
+		raise ValueError("RSSI values must be in [-128, 127] dBm, got [%g, %g]!"
+						 %(rounded.min(), rounded.max()))
+
+	return np.ascontiguousarray(rounded, dtype=np.int8)
+
+
+def case_geometry(case):
+	"""
+	Determine APs coordinates and the real target coordinate from case name.
+	1Dx means d = 1, 2Dx means d = 2, cont..
+	xD1 to xD4 is the position of the target.
+
+	Returns ([[x1, y1], [x2, y2], [x3, y3]], [xreal, yreal]).
+	"""
+	case = case.upper()
+
+	if case[0:1] == "1":
+		d = 1
+	elif case[0:1] == "2":
+		d = 2
+	elif case[0:1] == "3":
+		d = 3
+	elif case[0:1] == "4":
+		d = 4
+	else:
+		raise ValueError("Unknown distance in case '%s'!" %case)
+
+	# AP1, AP2, AP3
+	ap_coordinates = [[0, 0], [0, 1 * d], [1 * d, 1 * d]]
+
+	if case[1:3] == "D1":
+		real = [(1/2) * d, 1 * d]
+	elif case[1:3] == "D2":
+		real = [(1/4) * d, (3/4) * d]
+	elif case[1:3] == "D3":
+		real = [(1/2) * d, (1/2) * d]
+	elif case[1:3] == "D4":
+		real = [(1/2) * d, 0 * d]
+	else:
+		raise ValueError("Unknown target position in case '%s'!" %case)
+
+	return ap_coordinates, real
+
+
+def distance_params(ple, rssi_d0):
+	"""
+	Per AP float32 (rssi_d0, scale) used by distance, where
+	d = 10^((K - rssi) / (10 n)) = exp(scale * (K - rssi)).
+
+	ple and rssi_d0 are either one value for all APs, or one value per AP.
+	"""
+	ple = np.broadcast_to(np.asarray(ple, dtype=np.float32), (NUM_AP,))
+	rssi_d0 = np.broadcast_to(np.asarray(rssi_d0, dtype=np.float32), (NUM_AP,))
+
+	scale = (np.log(10) / (10*ple)).astype(np.float32)
+
+	return np.ascontiguousarray(rssi_d0), scale
+
+
+def distance(rssi, rssi_d0, scale, out):
+	"""
+	Convert an (n x 3) RSSI matrix into distances, written in place into out.
+	"""
+	np.subtract(rssi_d0, rssi, out=out)
+	np.multiply(out, scale, out=out)
+	np.exp(out, out=out)
+
+	return out
+
+
+def rssi_to_distance(batch, ple, rssi_d0):
+	"""
+	Convert RSSI into distance, d = 10^((K - rssi) / (10 n)),
+	written in place into batch.dist.
+
+	ple and rssi_d0 are either one value for all APs, or one value per AP.
+	"""
+	rssi_d0, scale = distance_params(ple, rssi_d0)
+
+	return distance(batch.rssi, rssi_d0, scale, batch.dist)
+
+
+def read_scans(path, case):
+	"""
+	Read a csv file of RSSI scans into a ScanBatch.
+	The 'Time' column is dropped, rows with NaN values are dropped,
+	and the first three remaining columns are AP1, AP2, and AP3.
+	"""
+	fname = path + case
+
+	if pd is not None:
+		df = pd.read_csv(fname)
+		return from_dataframe(df, case)
+
+	with open(fname, newline="") as f:
+		header = next(csv.reader(f))
+	usecols = [i for i, name in enumerate(header) if name.strip() != "Time"]
+
+	data = np.genfromtxt(fname, delimiter=",", skip_header=1, usecols=usecols,
+						 dtype=np.float32, ndmin=2)
+	data = data[~np.isnan(data).any(axis=1)]
+
+	return ScanBatch(data[:, 0:NUM_AP], case)
+
+
+#~~~~~~~~~~~~~~~~~~~~~~~~ pandas adapters ~~~~~~~~~~~~~~~~~~~~~~~~#
+
+def from_dataframe(df, case="", ap_coords=None, target=None):
+	"""
+	Create a ScanBatch from a data frame of raw scans.
+	ap_coords and target are determined from case when not given.
+	"""
+	if "Time" in df.columns:
+		df = df.drop(columns=["Time"])
+	df = df.dropna()
+
+	return ScanBatch(df.iloc[:, 0:NUM_AP].to_numpy(), case, ap_coords, target)
+
+
+def to_dataframe(batch):
+	"""
+	Export a ScanBatch as data frame with the same columns
+	trilateration_process used to return.
+	"""
+	if pd is None:
+		raise ImportError("pandas is required to export a ScanBatch as data frame!")
+
+	df = pd.DataFrame(batch.rssi, columns=["AP%d" %(i + 1) for i in range(NUM_AP)])
+	for i in range(NUM_AP):
+		df["dist%d" %(i + 1)] = batch.dist[:, i]
+
+	df["xreal"]   = batch.target[0]
+	df["xtrilat"] = batch.result["x"]
+	df["yreal"]   = batch.target[1]
+	df["ytrilat"] = batch.result["y"]
+	df["SQEtr"]   = batch.result["err"]
+
+	return df
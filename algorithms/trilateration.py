@@ -29,128 +29,47 @@ SOFTWARE.
 
 import os
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 
-######## Function to calculate trilateration parameters ########
-
-def trilat_params(xi,yi,xj,yj,ri,rj):
-	a = -2*xi + 2*xj
-	b = -2*yi + 2*yj
-	c = ri**2 - rj**2 - xi**2 + xj**2 - yi**2 + yj**2
-
-	return a,b,c
-
+from scanbatch import read_scans
+from kernels import fused_trilateration
+from results_cache import ResultsCache
 
 ######## Implementation of trilateration calculation process ########
 # Function of Trilateration Calculation Process
 # Data to be processed is stored as csv file. 
-# Data is processed entirely using pandas dataframe
+# Data is processed as a compact ScanBatch
 
 def trilateration_process(path, case, ple, rssi_d0):
-	# Read csv file as panda data frame
-	df = pd.read_csv(path+case)
-
-	# Drop 'Time' column
-	df = df.drop(columns=["Time"])
-
-	# Drop NaN values
-	df = df.dropna()
-
-	# Take only column 0-3 which is AP1, AP2, and AP3
-	# This step is important as sometimes the csv data
-	# has other column aside Time, and RSSI values of 
-	# AP1, AP2, and AP3
-
-	df = df.iloc[:,0:3]
-
-	# Rename columns to AP1, AP2, and AP3
-	df.columns = ["AP1", "AP2", "AP3"]
-
-
-	# Add path loss exponent and rssi at d0 parameters
-	# Create a lambda function to convert RSSI data into distance
-	dist = lambda k, n, rssi: 10**((k - rssi) / (10*n))
-
-	# Add distance columns in df 
-	for i in range(1,4):
-		df["dist%d"%i] = dist(rssi_d0, ple, df["AP%d"%i])
-
+	# Read csv file as scan batch, AP1, AP2, and AP3
+	# coordinates and the target coordinates are
+	# determined from the case name
+	batch = read_scans(path, case)
 
-	# Determining what is the distance case 
-	# 1Dx means d = 1, 2Dx means d = 2, cont..
+	# Distances, trilateration and the Squared Root Error in one pass.
+	# ple and rssi_d0 are either one value for all APs, or one value
+	# per AP (e.g. published by an OnlinePathloss calibrator)
+	fused_trilateration(batch, ple, rssi_d0)
 
-	if case[0] == "1":
-		d = 1
-	elif case[0] == "2":
-		d = 2
-	elif case[0] == "3":
-		d = 3
-	else:
-		d = 4
+	# Mean Squared Error
+	MSEtr = np.mean(batch.result["err"], dtype=np.float64)
 
+	ap_coordinates = batch.ap_coords.tolist()
 
-	# Setting APs coordinates
-	# AP1
-	x1 = 0
-	y1 = 0
+	# Return the trilateration batch and MSE
+	return (batch, MSEtr, ap_coordinates)
 
-	# AP2
-	x2 = 0
-	y2 = 1 * d
+######## Cached trilateration ########
+# Results of unchanged cases are taken from the cache.
+# Returns the cached columns x, y, err, target, and ap_coords.
 
-	# AP3
-	x3 = 1 * d
-	y3 = 1 * d
+def cached_trilateration(cache, path, case, ple, rssi_d0):
+	def compute():
+		batch, mse, ap_coordinates = trilateration_process(path, case, ple, rssi_d0)
+		return batch.result["x"], batch.result["y"], batch.target, ap_coordinates
 
-	ap_coordinates = [[x1,y1], [x2, y2], [x3, y3]]
-
-	# Calculation target Coordinates 
-	# check which STA position case is being analysed
-	# Also check whether the entered case is in capital or not
-
-	case = case.upper()
-	if case[1:3] == "D1":
-		xreal = (1/2) * d
-		yreal = 1*d
-	elif case[1:3] == "D2":
-		xreal = (1/4) * d
-		yreal = (3/4) * d
-	elif case[1:3] == "D3":
-		xreal = (1/2) * d
-		yreal = (1/2) * d
-	elif case[1:3] == "D4":
-		xreal = (1/2) * d
-		yreal = 0 * d
-
-	# Trilateration parameters calculation
-	# Calculate A, B, C, D, E, and F 
-	A, B, C = trilat_params(x1, y1, x2, y2, df["dist1"], df["dist2"])
-	D, E, F = trilat_params(x2, y2, x3, y3, df["dist2"], df["dist3"])
-
-	# Calculate x and y using trilateration
-	# x = CE - BF / AE - BD; y = CD - AF / BD - AE
-	xtr = (C*E - B*F) / (A*E - B*D)
-	ytr = (C*D - A*F) / (B*D - A*E)
-
-	# Determine the Squared Root Error and the Mean Squared Error 
-	SQEtr = np.sqrt((xtr - xreal)**2 + (ytr - yreal)**2)
-	MSEtr = np.mean(SQEtr)
-
-	# Add target coordinates,
-	# predicted coordinates by trilateration
-	# also the SQRT error in df
-
-	df["xreal"]   = xreal  		
-	df["xtrilat"] = xtr	
-
-	df["yreal"]   = yreal
-	df["ytrilat"] = ytr
-
-	df["SQEtr"]	  = SQEtr
-
-	# Return the trilateration df and MSE
-	return (df, MSEtr, ap_coordinates)
+	key = cache.key(path, case, "trilateration", ple=ple, rssi_d0=rssi_d0)
+	return cache.get_or_compute(key, compute)
 
 #~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~#
 #~~~~~~~~~~~~~~~~~~~~~~~~ Main Program ~~~~~~~~~~~~~~~~~~~~~~~~#
@@ -168,10 +87,15 @@ def main():
 	gamma = 2.255
 	K = -49
 
+	# Results of unchanged cases are taken from the cache
+	cache = ResultsCache()
+
 	# Run all cases in the directory
 	print(path)
 	for x in cases:
-		df, mse, ap_coords = trilateration_process(path, x, gamma, K)
+		res = cached_trilateration(cache, path, x, gamma, K)
+		mse = np.mean(res["err"], dtype=np.float64)
+		ap_coords = res["ap_coords"]
 
 		# Assign APs coordinates
 		ap1_xcoord = ap_coords[0][0]
@@ -223,9 +147,9 @@ def main():
 		plt.plot(ap1_xcoord, ap1_ycoord, "X", label = "AP1", markersize = 12, c = "red")
 		plt.plot(ap2_xcoord, ap2_ycoord, "X", label = "AP2", markersize = 12, c = "navy")
 		plt.plot(ap3_xcoord, ap3_yxoord, "X", label = "AP3", markersize = 12, c = "darkgreen")
-		plt.scatter(df["xtrilat"], df["ytrilat"], label = "tri", c = "blue")
-		plt.plot(df["xreal"], df["yreal"], "D", label = "real", markersize = 9, c = "brown")
-		plt.plot(np.mean(df["xtrilat"]), np.mean(df["ytrilat"]), "*", label = "$avg_{tri}$", markersize = 12, c = "black")
+		plt.scatter(res["x"], res["y"], label = "tri", c = "blue")
+		plt.plot(res["target"][0], res["target"][1], "D", label = "real", markersize = 9, c = "brown")
+		plt.plot(np.mean(res["x"]), np.mean(res["y"]), "*", label = "$avg_{tri}$", markersize = 12, c = "black")
 
 		# Setting the limits of graph
 		# also the ticks
@@ -38,15 +38,22 @@ import numpy as np
 import sympy as sym
 import matplotlib.pyplot as plt 
 
+from received_power import reference_power_dbm, log_distance_received_power_dbm
+
 
 class Pathloss:
-	def __init__(self, distance, measured, frequency):
+	def __init__(self, distance, measured, frequency, theoretical_k=False,
+				 pt_dbm=0.0, gt_dbi=0.0, gr_dbi=0.0):
 		"""
 		Class for creating a path loss object.
 
 		Distance is an array of distances from Tx to Rx.
 		Measured is the measured rssi values 
 		corresponding to the given distance.
+		If theoretical_k is True, K is the free space received
+		power at d0 instead of the measured rssi at d0, using the
+		transmit power pt_dbm (dBm) and antenna gains gt_dbi and
+		gr_dbi (dBi) of the Tx and Rx.
 		"""
 
 		# distance and rssi values
@@ -61,8 +68,10 @@ class Pathloss:
 		self.light_speed = 3e8
 		self.wavelength  = self.light_speed / self.freq
 		self.d0 = 1.0
-		#self.k = -20*np.log10(4 * np.pi * self.d0 / self.wavelength)
-		self.k = self.meas[1]
+		if theoretical_k:
+			self.k = reference_power_dbm(self.freq, self.d0, pt_dbm, gt_dbi, gr_dbi)
+		else:
+			self.k = self.meas[1]
 
 		# Finding log distance
 		self.log_dist = np.log10(self.dist)
@@ -124,7 +133,7 @@ class Pathloss:
 		Pathloss class method to calculate the simplified path loss model.
 		"""
 
-		self.path_loss_simplified = self.k - 10*self.ple_result*np.log10(self.dist)
+		self.path_loss_simplified = log_distance_received_power_dbm(self.dist, self.k, self.ple_result, self.d0)
 		#self.path_loss_simplified = self.k - 10*3.71*np.log10(self.dist)
 		return self.path_loss_simplified
 
@@ -0,0 +1,204 @@
+"""
+Author			: Muhammad Arifin
+Institution		: Department of Nuclear Engineering and Engineering Physics, Universitas Gadjah Mada
+License			: MIT License
+
+Description		: Online (streaming) re-calibration of the log-distance path loss
+				  model. Instead of refitting K, n and sigma from a static array
+				  like the Pathloss class does, every AP keeps a handful of running
+				  sums (sufficient statistics) which are updated in O(1) as
+				  reference-beacon measurements arrive. Older measurements can be
+				  discounted with an exponential forgetting factor so the model
+				  follows PLE drift (e.g. changing room occupancy).
+
+				  Model	: rssi = K - 10*n*log10(d/d0) + X_sigma
+
+				  With x = 10*log10(d/d0) and y = rssi, the weighted least squares
+				  solution of y = K - n*x only needs W, Sx, Sy, Sxx, Sxy, and Syy.
+"""
+
+import threading
+from types import MappingProxyType
+from collections import namedtuple
+
+import numpy as np
+
+
+# Published path loss parameters of one AP
+# k		: rssi at d0 (dBm)
+# n		: path loss exponent
+# sigma	: standard deviation of the shadowing (dB)
+# weight: effective number of samples behind the estimate
+PathlossParams = namedtuple("PathlossParams", ["k", "n", "sigma", "weight"])
+
+
+class OnlinePathloss:
+	def __init__(self, forgetting=1.0, d0=1.0, k=None, min_weight=2.0):
+		"""
+		Class for creating an online path loss calibrator.
+
+		Forgetting is the exponential forgetting factor in (0, 1].
+		1.0 means every sample counts forever, 0.99 gives an
+		effective memory of about 100 samples.
+		d0 is the reference distance in meter.
+		k is an optional fixed rssi at d0. If it is None, K is
+		estimated together with n, otherwise only n is fitted
+		(the same approach used by the Pathloss class).
+		min_weight is the effective number of samples needed
+		before parameters of an AP are published.
+		"""
+		if not 0.0 < forgetting <= 1.0:
+			raise ValueError("Forgetting factor must be in (0, 1]!")
+
+		self.forgetting = forgetting
+		self.d0 = d0
+		self.k  = k
+		self.min_weight = min_weight
+
+		# Running sums per AP: [W, Sx, Sy, Sxx, Sxy, Syy]
+		self.stats = {}
+
+		# Published parameters. The dict is never mutated, a new
+		# one replaces it so readers always see a consistent set
+		self._published = {}
+		self._lock = threading.Lock()
+
+	def update(self, ap, distance, rssi):
+		"""
+		OnlinePathloss method to add reference-beacon measurements
+		of one AP. Distance and rssi can be scalars or arrays,
+		samples are assumed to be in arrival order.
+
+		Samples with a non-finite rssi or a non-positive distance
+		are dropped, they would make the running sums NaN forever.
+
+		Returns the currently published parameters of the AP. These
+		are the previous ones when the new data can not be solved yet
+		(e.g. all samples at one distance) or has no valid samples,
+		and None when nothing has been published for the AP so far.
+		"""
+		distance = np.atleast_1d(np.asarray(distance, dtype=float))
+		y = np.atleast_1d(np.asarray(rssi, dtype=float))
+		distance, y = np.broadcast_arrays(distance, y)
+
+		valid = np.isfinite(distance) & (distance > 0) & np.isfinite(y)
+		if not valid.all():
+			distance, y = distance[valid], y[valid]
+		if len(y) == 0:
+			return self._published.get(ap)
+
+		x = 10*np.log10(distance / self.d0)
+
+		# Weight of every sample after forgetting is applied,
+		# the newest sample has weight 1
+		num = len(x)
+		w = self.forgetting ** np.arange(num - 1, -1, -1, dtype=float)
+		batch = np.array([w.sum(), w @ x, w @ y, w @ (x*x), w @ (x*y), w @ (y*y)])
+
+		with self._lock:
+			stats = self.stats.get(ap)
+			if stats is None:
+				stats = np.zeros(6)
+			stats = self.forgetting**num * stats + batch
+			self.stats[ap] = stats
+
+			params = self._solve(stats)
+			if params is not None:
+				published = dict(self._published)
+				published[ap] = params
+				self._published = published
+
+			return self._published.get(ap)
+
+	def _solve(self, stats):
+		"""
+		Solve K, n and sigma from the running sums of one AP.
+		"""
+		W, Sx, Sy, Sxx, Sxy, Syy = stats
+		if W < self.min_weight:
+			return None
+
+		if self.k is None:
+			# Fit both K and n
+			det = W*Sxx - Sx**2
+			if det <= 1e-12 * max(W*Sxx, 1.0):
+				return None # all samples at the same distance
+			slope = (W*Sxy - Sx*Sy) / det
+			k = (Sy - slope*Sx) / W
+			n = -slope
+		else:
+			# Fixed K, fit n only
+			if Sxx <= 1e-12:
+				return None
+			k = self.k
+			n = (k*Sx - Sxy) / Sxx
+
+		# Sum of squared residuals of y - K + n*x, expanded into the running sums
+		sse = Syy + W*k**2 + n**2*Sxx - 2*k*Sy + 2*n*Sxy - 2*k*n*Sx
+		sigma = np.sqrt(max(sse, 0.0) / W)
+
+		return PathlossParams(float(k), float(n), float(sigma), float(W))
+
+	def parameters(self):
+		"""
+		OnlinePathloss method to get a consistent snapshot of the
+		published parameters of all APs as a read-only
+		{ap: PathlossParams} mapping.
+		"""
+		return MappingProxyType(self._published)
+
+	def reset(self, ap=None):
+		"""
+		OnlinePathloss method to forget all data of one AP, or of
+		every AP when ap is None.
+		"""
+		with self._lock:
+			if ap is None:
+				self.stats = {}
+				self._published = {}
+			else:
+				self.stats.pop(ap, None)
+				published = dict(self._published)
+				published.pop(ap, None)
+				self._published = published
+
+	def positioning_params(self, aps, default=None):
+		"""
+		OnlinePathloss method to get (ple, rssi_d0) arrays for the
+		given APs, in the same order, from a single snapshot.
+		They are in the order trilateration_process expects, e.g.
+		trilateration_process(path, case, *calibrator.positioning_params(aps))
+
+		default is the PathlossParams used for APs that are not
+		published yet. Without it those APs raise a ValueError.
+		"""
+		published = self._published
+
+		params = []
+		for ap in aps:
+			p = published.get(ap, default)
+			if p is None:
+				raise ValueError("Path loss parameters of %s are not calibrated yet!" %ap)
+			params.append(p)
+
+		n = np.array([p.n for p in params])
+		k = np.array([p.k for p in params])
+		return n, k
+
+
+def main():
+	# Simulated reference-beacon stream of one AP whose PLE
+	# drifts from 2.0 to 3.0 halfway (e.g. people entering the room)
+	rng = np.random.default_rng(0)
+	dist = rng.uniform(0.5, 5.0, 2000)
+	ple  = np.where(np.arange(2000) < 1000, 2.0, 3.0)
+	rssi = -49 - 10*ple*np.log10(dist) + rng.normal(0, 2.0, 2000)
+
+	calibrator = OnlinePathloss(forgetting=0.99)
+	for i in range(len(dist)):
+		params = calibrator.update("AP1", dist[i], rssi[i])
+		if (i + 1) % 250 == 0:
+			print("Sample %4d  K = %6.2f  n = %4.2f  sigma = %4.2f" %(i + 1, params.k, params.n, params.sigma))
+
+if __name__ == '__main__':
+	main()
@@ -36,6 +36,8 @@ SOFTWARE.
 import numpy as np 
 import sympy as sym 
 
+from received_power import reference_power_dbm
+
 
 # Real Path Loss Data
 # Measured on 20 April 2020
@@ -46,12 +48,10 @@ import sympy as sym
 #measured = np.array([-49, -53, -58, -60, -68, -60, -59, -60, -64, -68])
 def finding_ple(distance, measured, frequency):
 
-	c = 3e8
-
 	# Finding log distance and K
 	log_dist = np.log10(dist)
 
-	k = -20*np.log10(4*np.pi * frequency/c) # Path loss at 1.0 meter
+	k = reference_power_dbm(frequency) # Free space received power at 1.0 meter
 
 	# Symbolic path loss exponent (n)
 	n = sym.Symbol('n') 
@@ -82,9 +82,7 @@ def finding_std_dev(dist, measured, ple, frequency):
 	# Finding log distance and K
 	log_dist = np.log10(dist)
 
-	c = 3e8
-
-	k = -20*np.log10(4*np.pi * frequency/c) # Path loss at 1.0 meter
+	k = reference_power_dbm(frequency) # Free space received power at 1.0 meter
 
 	# Calculating average of F(n)
 	fn_total = (measured - k + 10*ple*log_dist)**2
@@ -1,34 +1,93 @@
-import numpy as np 
+"""
+Author			: Muhammad Arifin
+Institution		: Department of Nuclear Engineering and Engineering Physics, Universitas Gadjah Mada
+License			: MIT License
+
+Description		: Received power models (free space / Friis and simplified
+				  log-distance) in dBm. All functions broadcast over their
+				  arguments, so a sweep over distances x frequencies x antenna
+				  gains is a single array operation, e.g.
+
+				  d, f, g = np.ix_(dist, [2.412e9, 2.437e9, 5.18e9], [0, 3])
+				  pr = friis_received_power_dbm(d, f, pt_dbm=20, gt_dbi=g)
+				  # pr.shape == (len(dist), 3, 2)
+"""
+
+import numpy as np
 import matplotlib.pyplot as plt
 
-d = np.linspace(1,10,100)
-pt = 1
-Gl = 1
-c = 3*(10**8)
-
-f1 = 300 #MHz
-f2 = 600*(10**6) #MHz
-f3 = 900*(10**6) #GHz
-
-lm1 = c/f1
-lm2 = c/f2
-lm3 = c/f3
-
-pr1 = pt * ((np.sqrt(Gl)*lm1) / (4*np.pi*d))**2
-pr2 = pt * ((np.sqrt(Gl)*lm2) / (4*np.pi*d))**2
-pr3 = pt * ((np.sqrt(Gl)*lm3) / (4*np.pi*d))**2
-
-#pr1 = np.log10(pt) + 10*np.log10(Gl) + 20*np.log10(lm1) - 20*np.log10(4*np.pi) - 20*np.log10(d)
-#pr2 = np.log10(pt) + 10*np.log10(Gl) + 20*np.log10(lm2) - 20*np.log10(4*np.pi) - 20*np.log10(d)
-
-plt.title("Received Power vs Frequency")
-plt.plot(d, pr1*(10**3),linestyle='-.', color='black',label="$f$ = 300 MHz")
-plt.plot(d, pr2*(10**3),linestyle='-', color='black',label="$f$ = 600 MHz")
-plt.plot(d, pr3*(10**3),linestyle='--', color='black',label="$f$ = 900 MHz")
-plt.xlim([1,10])
-plt.ylim([0,6])
-plt.xlabel("d [m]")
-plt.ylabel("$P_{r}$ [mW]")
-plt.legend()
-plt.grid()
-plt.show()
+LIGHT_SPEED = 3e8
+
+
+def wavelength(frequency):
+	"""
+	Wavelength (m) of the given frequency (Hz).
+	"""
+	return LIGHT_SPEED / np.asarray(frequency, dtype=float)
+
+
+def free_space_path_loss_db(distance, frequency):
+	"""
+	Free space path loss (dB) at distance (m) and frequency (Hz),
+	FSPL = 20*log10(4*pi*d / lambda).
+	"""
+	distance = np.asarray(distance, dtype=float)
+	return 20*np.log10(4*np.pi * distance / wavelength(frequency))
+
+
+def friis_received_power_dbm(distance, frequency, pt_dbm=0.0, gt_dbi=0.0, gr_dbi=0.0):
+	"""
+	Received power (dBm) using the Friis free space equation,
+	Pr = Pt + Gt + Gr - FSPL.
+	"""
+	return pt_dbm + np.asarray(gt_dbi) + np.asarray(gr_dbi) - free_space_path_loss_db(distance, frequency)
+
+
+def reference_power_dbm(frequency, d0=1.0, pt_dbm=0.0, gt_dbi=0.0, gr_dbi=0.0):
+	"""
+	Theoretical received power K (dBm) at the reference distance d0,
+	used as K of the simplified path loss model.
+	"""
+	return friis_received_power_dbm(d0, frequency, pt_dbm, gt_dbi, gr_dbi)
+
+
+def log_distance_received_power_dbm(distance, k, n, d0=1.0):
+	"""
+	Received power (dBm) using the simplified path loss model,
+	Pr = K - 10*n*log10(d/d0).
+	"""
+	distance = np.asarray(distance, dtype=float)
+	return np.asarray(k) - 10*np.asarray(n)*np.log10(distance / d0)
+
+
+def dbm_to_mw(power_dbm):
+	"""
+	Convert power from dBm to mW.
+	"""
+	return 10**(np.asarray(power_dbm) / 10)
+
+
+def main():
+	d  = np.linspace(1,10,100)
+	pt = 10*np.log10(1 * 1e3) # 1 W in dBm
+	Gl = 0 # dBi
+
+	freqs  = np.array([300e6, 600e6, 900e6])
+	styles = ['-.', '-', '--']
+
+	# All frequencies at once, shape (len(d), len(freqs))
+	pr = dbm_to_mw(friis_received_power_dbm(d[:, None], freqs[None, :], pt, Gl))
+
+	plt.title("Received Power vs Frequency")
+	for i in range(len(freqs)):
+		plt.plot(d, pr[:, i], linestyle=styles[i], color='black', label="$f$ = %d MHz" %(freqs[i] / 1e6))
+	plt.xlim([1,10])
+	plt.ylim([0,6])
+	plt.xlabel("d [m]")
+	plt.ylabel("$P_{r}$ [mW]")
+	plt.legend()
+	plt.grid()
+	plt.show()
+
+if __name__ == '__main__':
+	main()